@@ -9,18 +9,34 @@ Usage:
 
 from __future__ import annotations
 
+import hashlib
+import importlib
+import importlib.util
 import json
 import os
+import pkgutil
 import shutil
 import stat
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import PackageNotFoundError, distribution, distributions, version
 from pathlib import Path
 from typing import Iterable, List
 
 ROOT = Path(__file__).resolve().parent
 DIST_NAME = "ExpenseTimeTracker"
 PACKAGE_DIR = ROOT / "ExpenseTracker-Portable"
+PIP_CACHE_DIR = ROOT / ".pip-cache"
+BUILD_CACHE_PATH = ROOT / ".build-cache.json"
+# Level 1 strips asserts only; level 2 would also strip the docstrings that
+# FastMCP turns into the tool descriptions Claude sees.
+OPTIMIZE_LEVEL = 1
+# Distributions whose .dist-info must ship with the exe; fastmcp reads its own
+# __version__ through importlib.metadata at import time.
+METADATA_PACKAGES = ("fastmcp", "py-key-value-aio", "py-key-value-shared")
+# Standard-library modules a headless MCP server never imports.
+EXCLUDED_MODULES = ("tkinter", "unittest", "pydoc")
 REQUIRED_PACKAGES = {
     "pyinstaller": "PyInstaller",
     "fastmcp": "fastmcp",
@@ -43,18 +59,27 @@ def ensure_dependencies() -> None:
     print_step("Step 1/4 - Checking dependencies")
     missing = []
     for install_name, import_name in REQUIRED_PACKAGES.items():
+        # Metadata lookup only; nothing from the package gets imported or executed.
         try:
-            __import__(import_name)
+            distribution(install_name.split("[")[0])
             print(f"  [OK] {import_name} found")
-        except ImportError:
+        except PackageNotFoundError:
             missing.append(install_name)
 
     if not missing:
         return
 
     print(f"\n  Installing missing packages: {', '.join(missing)}")
-    for pkg in missing:
-        run([sys.executable, "-m", "pip", "install", pkg])
+    run([
+        sys.executable,
+        "-m",
+        "pip",
+        "install",
+        "--cache-dir",
+        str(PIP_CACHE_DIR),
+        "--prefer-binary",
+        *missing,
+    ])
     print("  [OK] Dependencies installed\n")
 
 
@@ -69,12 +94,25 @@ def _handle_remove_readonly(func, path, exc_info):
         raise exc
 
 
+def remove_tree(path: Path) -> None:
+    if os.name == "nt":
+        # rmdir deletes the whole tree natively and handles read-only files itself.
+        subprocess.run(
+            ["cmd", "/c", "rmdir", "/S", "/Q", str(path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if not path.exists():
+            return
+    shutil.rmtree(path, onerror=_handle_remove_readonly)
+
+
 def clean_previous_artifacts() -> None:
     print_step("Step 2/4 - Cleaning previous build artifacts")
     for target in ("build", "dist", "__pycache__", f"{DIST_NAME}.spec"):
         path = ROOT / target
         if path.is_dir():
-            shutil.rmtree(path, onerror=_handle_remove_readonly)
+            remove_tree(path)
             print(f"  [OK] Removed {path.relative_to(ROOT)}")
         elif path.exists():
             path.unlink()
@@ -106,23 +144,99 @@ def ensure_categories_file() -> None:
     print("  [OK] Created categories.json")
 
 
-def find_fastmcp_package() -> Path:
+def installed_distributions_fingerprint() -> str:
+    # Which fastmcp submodules import depends on the optional packages installed
+    # alongside it, so any install/uninstall/upgrade must invalidate the cache.
+    entries = sorted(f"{dist.metadata['Name']}=={dist.version}" for dist in distributions())
+    return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+
+
+def build_cache_key() -> dict | None:
+    try:
+        fastmcp_version = version("fastmcp")
+    except PackageNotFoundError:
+        return None
+    return {
+        "python": sys.executable,
+        "fastmcp_version": fastmcp_version,
+        "environment": installed_distributions_fingerprint(),
+    }
+
+
+def load_build_cache() -> dict:
+    # Entries are only trusted for the interpreter and fastmcp release that wrote them.
+    key = build_cache_key()
+    if key is None:
+        return {}
     try:
-        import fastmcp  # type: ignore
+        cached = json.loads(BUILD_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if any(cached.get(name) != value for name, value in key.items()):
+        return {}
+    return cached
+
+
+def save_build_cache(**entries) -> None:
+    key = build_cache_key()
+    if key is None:
+        return
+    cache = {**load_build_cache(), **key, **entries}
+    BUILD_CACHE_PATH.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+
+
+def fastmcp_hidden_imports() -> List[str]:
+    # Walking fastmcp imports every submodule, so reuse the last build's list when possible.
+    cached = load_build_cache().get("fastmcp_modules")
+    if cached:
+        print(f"  [OK] {len(cached)} fastmcp modules marked as hidden imports (cached)")
+        return cached
 
-        path = Path(fastmcp.__file__).resolve().parent
-        print(f"  [OK] fastmcp package located at {path}")
-        return path
+    try:
+        modules = walk_importable_modules("fastmcp")
     except ImportError:
         raise SystemExit(
             "fastmcp is not installed. Please rerun the script so it can install dependencies."
         )
+    save_build_cache(fastmcp_modules=modules)
+    return modules
+
+
+def walk_importable_modules(package: str) -> List[str]:
+    root = importlib.import_module(package)
+    names = [package]
+    for info in pkgutil.walk_packages(root.__path__, f"{package}.", onerror=lambda name: None):
+        try:
+            importlib.import_module(info.name)
+        except Exception:
+            continue
+        names.append(info.name)
+    print(f"  [OK] {len(names)} {package} modules marked as hidden imports")
+    return names
+
+
+def has_data_files(package: str) -> bool:
+    spec = importlib.util.find_spec(package)
+    if spec is None or not spec.submodule_search_locations:
+        return False
+    for location in spec.submodule_search_locations:
+        for path in Path(location).rglob("*"):
+            if not path.is_file() or "__pycache__" in path.parts or path.name == "py.typed":
+                continue
+            if path.suffix not in (".py", ".pyc", ".pyi"):
+                return True
+    return False
+
+
+def pyinstaller_supports_optimize() -> bool:
+    # --optimize was added in PyInstaller 6.6; older releases honour PYTHONOPTIMIZE.
+    major, minor = (int(part) for part in version("pyinstaller").split(".")[:2])
+    return (major, minor) >= (6, 6)
 
 
 def build_executable() -> None:
     print_step("Step 3/4 - Building ExpenseTimeTracker.exe")
     ensure_categories_file()
-    fastmcp_path = find_fastmcp_package()
 
     data_sep = ";" if os.name == "nt" else ":"
 
@@ -133,17 +247,24 @@ def build_executable() -> None:
         "--onefile",
         f"--name={DIST_NAME}",
         f"--add-data=categories.json{data_sep}.",
-        f"--add-data={fastmcp_path}{data_sep}fastmcp",
-        "--hidden-import=fastmcp",
+        *(f"--hidden-import={name}" for name in fastmcp_hidden_imports()),
         "--hidden-import=sqlite3",
         "--hidden-import=json",
         "--hidden-import=datetime",
-        "--collect-all=fastmcp",
-        "--collect-all=key_value",
-        "--noconfirm",
-        "--clean",
-        "main.py",
+        "--collect-submodules=key_value",
+        *(f"--copy-metadata={name}" for name in METADATA_PACKAGES),
+        *(f"--exclude-module={name}" for name in EXCLUDED_MODULES),
     ]
+    if pyinstaller_supports_optimize():
+        pyinstaller_cmd.append(f"--optimize={OPTIMIZE_LEVEL}")
+    else:
+        os.environ["PYTHONOPTIMIZE"] = str(OPTIMIZE_LEVEL)
+    # Bundle package data (schemas, templates) only where it exists; the code itself
+    # arrives through the hidden imports above.
+    for package in ("fastmcp", "key_value"):
+        if has_data_files(package):
+            pyinstaller_cmd.append(f"--collect-data={package}")
+    pyinstaller_cmd += ["--noconfirm", "--clean", "main.py"]
 
     run(pyinstaller_cmd)
     exe_path = ROOT / "dist" / f"{DIST_NAME}.exe"
@@ -157,10 +278,34 @@ def write_text_file(path: Path, content: str) -> None:
     print(f"  [OK] Wrote {path.relative_to(ROOT)}")
 
 
+def copy_file(src: Path, dst: Path) -> tuple[Path, Path]:
+    if os.name == "nt":
+        # CopyFileExW lets the kernel do the copy (and any filesystem-level
+        # shortcuts) instead of streaming the file through Python buffers.
+        import ctypes
+        from ctypes import wintypes
+
+        # A private WinDLL with use_last_error keeps GetLastError() from being
+        # clobbered by other ctypes calls made on this thread before we read it.
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.CopyFileExW.argtypes = [
+            wintypes.LPCWSTR, wintypes.LPCWSTR,
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+            wintypes.DWORD,
+        ]
+        kernel32.CopyFileExW.restype = wintypes.BOOL
+        if not kernel32.CopyFileExW(str(src), str(dst), None, None, None, 0):
+            raise ctypes.WinError(ctypes.get_last_error(), f"CopyFileExW failed: {src} -> {dst}")
+    else:
+        # copy2 already uses sendfile()/fcopyfile() outside Windows.
+        shutil.copy2(src, dst)
+    return src, dst
+
+
 def create_portable_package() -> None:
     print_step("Step 4/4 - Creating ExpenseTracker-Portable/")
     if PACKAGE_DIR.exists():
-        shutil.rmtree(PACKAGE_DIR, onerror=_handle_remove_readonly)
+        remove_tree(PACKAGE_DIR)
     PACKAGE_DIR.mkdir()
 
     files_to_copy = {
@@ -172,12 +317,16 @@ def create_portable_package() -> None:
     if tracker_db.exists():
         files_to_copy[tracker_db] = PACKAGE_DIR / "tracker.db"
 
+    copies = []
     for src, dst in files_to_copy.items():
         if not src.exists():
             print(f"  [WARN] Skipping missing file: {src.name}")
             continue
-        shutil.copy2(src, dst)
-        print(f"  [OK] Copied {src.name} -> {dst.relative_to(ROOT)}")
+        copies.append((src, dst))
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        for src, dst in pool.map(lambda pair: copy_file(*pair), copies):
+            print(f"  [OK] Copied {src.name} -> {dst.relative_to(ROOT)}")
 
     readme_text = """
 Expense & Time Tracker - Portable Build
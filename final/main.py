@@ -1,7 +1,11 @@
 from fastmcp import FastMCP
+import json
 import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from typing import NotRequired, TypedDict
 
 # Local paths
 DB_PATH = os.path.join(os.path.dirname(__file__), "tracker.db")
@@ -9,9 +13,52 @@ CATEGORIES_PATH = os.path.join(os.path.dirname(__file__), "categories.json")
 
 mcp = FastMCP("ExpenseAndTimeTracker")
 
+# Connection tuning applied once to the shared connection
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+)
+
+def _connect():
+    """Open the shared database connection and apply the connection PRAGMAs"""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def _rows(cur):
+    """Convert the remaining rows of a cursor into plain dicts"""
+    return [dict(r) for r in cur]
+
+# Single connection reused by every tool; the lock serializes access to it.
+# It is opened by the warm-up thread started below, which sets _DB_READY when done.
+_CONN = None
+_DB_LOCK = threading.Lock()
+_DB_READY = threading.Event()
+_DB_ERROR = None
+
+@contextmanager
+def _db():
+    """Wait for the warm-up thread, then yield the shared connection inside a transaction"""
+    _DB_READY.wait()
+    if _DB_ERROR is not None:
+        raise RuntimeError(f"Database initialization failed: {_DB_ERROR}") from _DB_ERROR
+    with _DB_LOCK, _CONN as c:
+        yield c
+
+# Bump whenever init_db() gains new schema objects so existing databases pick them up
+SCHEMA_VERSION = 6
+
 def init_db():
     """Initialize both expense and time tracking tables"""
-    with sqlite3.connect(DB_PATH) as c:
+    with _DB_LOCK, _CONN as c:
+        # Schema already current; skip the DDL entirely
+        if c.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
         # Expense table
         c.execute("""
             CREATE TABLE IF NOT EXISTS expenses(
@@ -45,7 +92,103 @@ def init_db():
                 color TEXT DEFAULT '#3b82f6'
             )
         """)
-        
+
+        # Plain (date) indexes keep rows in (date, id) order, so the date-range
+        # listings stream straight from the index without a sort.
+        c.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date)")
+        # Covers the expense rollup triggers, which recompute a single (date, category) group
+        c.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date_cat ON expenses(date, category, amount)")
+        c.execute("DROP INDEX IF EXISTS idx_time_date_act")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_time_date ON time_entries(date)")
+
+        # Per-day rollups kept in sync by triggers; summaries read these instead of raw rows
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS daily_expense_rollup(
+                date TEXT NOT NULL,
+                category TEXT NOT NULL,
+                total REAL NOT NULL,
+                cnt INTEGER NOT NULL,
+                PRIMARY KEY(date, category)
+            )
+        """)
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS daily_time_rollup(
+                date TEXT NOT NULL,
+                activity TEXT NOT NULL,
+                total_minutes INTEGER NOT NULL,
+                cnt INTEGER NOT NULL,
+                PRIMARY KEY(date, activity)
+            )
+        """)
+        # Inserts add to the rollup row; deletes and updates recompute the affected
+        # (date, category) group through idx_expenses_date_cat rather than subtracting,
+        # so removals leave no float residue. Readers round the totals to cents.
+        for name in ("trg_exp_ins", "trg_exp_del", "trg_exp_upd"):
+            c.execute(f"DROP TRIGGER IF EXISTS {name}")
+        c.execute("""
+            CREATE TRIGGER trg_exp_ins AFTER INSERT ON expenses BEGIN
+                INSERT INTO daily_expense_rollup VALUES(NEW.date, NEW.category, NEW.amount, 1)
+                ON CONFLICT(date, category) DO UPDATE SET total = total + NEW.amount, cnt = cnt + 1;
+            END
+        """)
+        c.execute("""
+            CREATE TRIGGER trg_exp_del AFTER DELETE ON expenses BEGIN
+                DELETE FROM daily_expense_rollup WHERE date = OLD.date AND category = OLD.category;
+                INSERT INTO daily_expense_rollup(date, category, total, cnt)
+                SELECT date, category, SUM(amount), COUNT(*) FROM expenses
+                WHERE date = OLD.date AND category = OLD.category GROUP BY date, category;
+            END
+        """)
+        c.execute("""
+            CREATE TRIGGER trg_exp_upd AFTER UPDATE OF date, category, amount ON expenses BEGIN
+                DELETE FROM daily_expense_rollup WHERE date = OLD.date AND category = OLD.category;
+                INSERT INTO daily_expense_rollup(date, category, total, cnt)
+                SELECT date, category, SUM(amount), COUNT(*) FROM expenses
+                WHERE date = OLD.date AND category = OLD.category GROUP BY date, category;
+                INSERT OR REPLACE INTO daily_expense_rollup(date, category, total, cnt)
+                SELECT date, category, SUM(amount), COUNT(*) FROM expenses
+                WHERE date = NEW.date AND category = NEW.category GROUP BY date, category;
+            END
+        """)
+        c.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_time_ins AFTER INSERT ON time_entries BEGIN
+                INSERT INTO daily_time_rollup VALUES(NEW.date, NEW.activity, NEW.duration_minutes, 1)
+                ON CONFLICT(date, activity) DO UPDATE
+                SET total_minutes = total_minutes + NEW.duration_minutes, cnt = cnt + 1;
+            END
+        """)
+        c.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_time_del AFTER DELETE ON time_entries BEGIN
+                UPDATE daily_time_rollup SET total_minutes = total_minutes - OLD.duration_minutes, cnt = cnt - 1
+                WHERE date = OLD.date AND activity = OLD.activity;
+                DELETE FROM daily_time_rollup
+                WHERE date = OLD.date AND activity = OLD.activity AND cnt <= 0;
+            END
+        """)
+        c.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_time_upd AFTER UPDATE OF date, activity, duration_minutes ON time_entries BEGIN
+                UPDATE daily_time_rollup SET total_minutes = total_minutes - OLD.duration_minutes, cnt = cnt - 1
+                WHERE date = OLD.date AND activity = OLD.activity;
+                DELETE FROM daily_time_rollup
+                WHERE date = OLD.date AND activity = OLD.activity AND cnt <= 0;
+                INSERT INTO daily_time_rollup VALUES(NEW.date, NEW.activity, NEW.duration_minutes, 1)
+                ON CONFLICT(date, activity) DO UPDATE
+                SET total_minutes = total_minutes + NEW.duration_minutes, cnt = cnt + 1;
+            END
+        """)
+
+        # Rebuild the rollups from the raw tables so upgraded databases start out in sync
+        c.execute("DELETE FROM daily_expense_rollup")
+        c.execute("""
+            INSERT INTO daily_expense_rollup(date, category, total, cnt)
+            SELECT date, category, SUM(amount), COUNT(*) FROM expenses GROUP BY date, category
+        """)
+        c.execute("DELETE FROM daily_time_rollup")
+        c.execute("""
+            INSERT INTO daily_time_rollup(date, activity, total_minutes, cnt)
+            SELECT date, activity, SUM(duration_minutes), COUNT(*) FROM time_entries GROUP BY date, activity
+        """)
+
         # Insert default activity categories if empty
         cur = c.execute("SELECT COUNT(*) FROM activity_categories")
         if cur.fetchone()[0] == 0:
@@ -65,7 +208,65 @@ def init_db():
                 default_activities
             )
 
-init_db()
+        c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def _warm_db():
+    """Open the connection, bring the schema up to date and pull the catalog into the page cache"""
+    global _CONN, _DB_ERROR
+    try:
+        _CONN = _connect()
+        init_db()
+        _CONN.execute("SELECT name FROM sqlite_master").fetchall()
+    except Exception as e:
+        _DB_ERROR = e
+    finally:
+        _DB_READY.set()
+
+# Runs alongside the rest of start-up so the first tool call finds the database hot
+threading.Thread(target=_warm_db, name="db-warmup", daemon=True).start()
+
+# ==================== SQL ====================
+# Fixed statement strings (one variant per optional filter) so every call
+# hits sqlite3's prepared-statement cache instead of building a new query.
+
+_SQL_LIST_EXP = """
+    SELECT id, date, amount, category, subcategory, note
+    FROM expenses
+    WHERE date BETWEEN ? AND ?
+    ORDER BY date DESC, id DESC
+"""
+
+_SQL_SUM_EXP_SELECT = """
+    SELECT category, ROUND(SUM(total), 2) AS total_amount, SUM(cnt) as count
+    FROM daily_expense_rollup
+    WHERE date BETWEEN ? AND ?
+"""
+_SQL_SUM_EXP = _SQL_SUM_EXP_SELECT + " GROUP BY category ORDER BY total_amount DESC"
+_SQL_SUM_EXP_CAT = _SQL_SUM_EXP_SELECT + " AND category = ? GROUP BY category ORDER BY total_amount DESC"
+
+_SQL_LIST_TIME_SELECT = """
+    SELECT id, date, activity, duration_minutes, start_time, end_time, note,
+           ROUND(duration_minutes / 60.0, 2) AS duration_hours
+    FROM time_entries
+    WHERE date BETWEEN ? AND ?
+"""
+_SQL_LIST_TIME = _SQL_LIST_TIME_SELECT + " ORDER BY date DESC, id DESC"
+_SQL_LIST_TIME_ACT = _SQL_LIST_TIME_SELECT + " AND activity = ? ORDER BY date DESC, id DESC"
+
+_SQL_SUM_TIME_SELECT = """
+    SELECT activity,
+           SUM(total_minutes) AS total_minutes,
+           SUM(cnt) as entry_count,
+           1.0 * SUM(total_minutes) / SUM(cnt) as avg_minutes,
+           ROUND(SUM(total_minutes) / 60.0, 2) AS total_hours,
+           ROUND(SUM(total_minutes) / 60.0 / SUM(cnt), 2) AS avg_hours,
+           COALESCE(ROUND(100.0 * SUM(total_minutes)
+                          / NULLIF(SUM(SUM(total_minutes)) OVER (), 0), 1), 0) AS percentage
+    FROM daily_time_rollup
+    WHERE date BETWEEN ? AND ?
+"""
+_SQL_SUM_TIME = _SQL_SUM_TIME_SELECT + " GROUP BY activity ORDER BY total_minutes DESC"
+_SQL_SUM_TIME_ACT = _SQL_SUM_TIME_SELECT + " AND activity = ? GROUP BY activity ORDER BY total_minutes DESC"
 
 # ==================== EXPENSE TOOLS ====================
 
@@ -80,13 +281,36 @@ def add_expense(date: str, amount: float, category: str, subcategory: str = "",
         subcategory: Optional subcategory
         note: Optional note
     """
-    with sqlite3.connect(DB_PATH) as c:
+    with _db() as c:
         cur = c.execute(
             "INSERT INTO expenses(date, amount, category, subcategory, note) VALUES (?,?,?,?,?)",
             (date, amount, category, subcategory, note)
         )
         return {"status": "success", "id": cur.lastrowid, "message": "Expense added successfully"}
 
+class ExpenseRow(TypedDict):
+    """One add_expenses_bulk entry; same fields and defaults as add_expense"""
+    date: str
+    amount: float
+    category: str
+    subcategory: NotRequired[str]
+    note: NotRequired[str]
+
+@mcp.tool()
+def add_expenses_bulk(rows: list[ExpenseRow]):
+    """Add several expense entries in a single transaction.
+    
+    Args:
+        rows: Expense entries, each with date, amount and category keys and
+            optional subcategory and note keys (same meaning as add_expense)
+    """
+    with _db() as c:
+        c.executemany(
+            "INSERT INTO expenses(date, amount, category, subcategory, note) VALUES (?,?,?,?,?)",
+            [(r['date'], r['amount'], r['category'], r.get('subcategory', ""), r.get('note', "")) for r in rows]
+        )
+        return {"status": "success", "count": len(rows), "message": f"{len(rows)} expenses added successfully"}
+
 @mcp.tool()
 def list_expenses(start_date: str, end_date: str):
     """List expense entries within an inclusive date range.
@@ -95,18 +319,9 @@ def list_expenses(start_date: str, end_date: str):
         start_date: Start date in YYYY-MM-DD format
         end_date: End date in YYYY-MM-DD format
     """
-    with sqlite3.connect(DB_PATH) as c:
-        cur = c.execute(
-            """
-            SELECT id, date, amount, category, subcategory, note
-            FROM expenses
-            WHERE date BETWEEN ? AND ?
-            ORDER BY date DESC, id DESC
-            """,
-            (start_date, end_date)
-        )
-        cols = [d[0] for d in cur.description]
-        return [dict(zip(cols, r)) for r in cur.fetchall()]
+    with _db() as c:
+        cur = c.execute(_SQL_LIST_EXP, (start_date, end_date))
+        return _rows(cur)
 
 @mcp.tool()
 def summarize_expenses(start_date: str, end_date: str, category: str = None):
@@ -117,20 +332,12 @@ def summarize_expenses(start_date: str, end_date: str, category: str = None):
         end_date: End date in YYYY-MM-DD format
         category: Optional category filter
     """
-    with sqlite3.connect(DB_PATH) as c:
-        query = """
-            SELECT category, SUM(amount) AS total_amount, COUNT(*) as count
-            FROM expenses
-            WHERE date BETWEEN ? AND ?
-        """
-        params = [start_date, end_date]
+    with _db() as c:
         if category:
-            query += " AND category = ?"
-            params.append(category)
-        query += " GROUP BY category ORDER BY total_amount DESC"
-        cur = c.execute(query, params)
-        cols = [d[0] for d in cur.description]
-        return [dict(zip(cols, r)) for r in cur.fetchall()]
+            cur = c.execute(_SQL_SUM_EXP_CAT, (start_date, end_date, category))
+        else:
+            cur = c.execute(_SQL_SUM_EXP, (start_date, end_date))
+        return _rows(cur)
 
 # ==================== TIME TRACKING TOOLS ====================
 
@@ -146,13 +353,37 @@ def add_time_entry(date: str, activity: str, duration_minutes: int, start_time:
         end_time: Optional end time in HH:MM format
         note: Optional note about the activity
     """
-    with sqlite3.connect(DB_PATH) as c:
+    with _db() as c:
         cur = c.execute(
             "INSERT INTO time_entries(date, activity, duration_minutes, start_time, end_time, note) VALUES (?,?,?,?,?,?)",
             (date, activity, duration_minutes, start_time, end_time, note)
         )
         return {"status": "success", "id": cur.lastrowid, "message": f"Time entry added: {duration_minutes} minutes on {activity}"}
 
+class TimeEntryRow(TypedDict):
+    """One add_time_entries_bulk entry; same fields and defaults as add_time_entry"""
+    date: str
+    activity: str
+    duration_minutes: int
+    start_time: NotRequired[str | None]
+    end_time: NotRequired[str | None]
+    note: NotRequired[str]
+
+@mcp.tool()
+def add_time_entries_bulk(rows: list[TimeEntryRow]):
+    """Add several time tracking entries in a single transaction.
+    
+    Args:
+        rows: Time entries, each with date, activity and duration_minutes keys and
+            optional start_time, end_time and note keys (same meaning as add_time_entry)
+    """
+    with _db() as c:
+        c.executemany(
+            "INSERT INTO time_entries(date, activity, duration_minutes, start_time, end_time, note) VALUES (?,?,?,?,?,?)",
+            [(r['date'], r['activity'], r['duration_minutes'], r.get('start_time'), r.get('end_time'), r.get('note', "")) for r in rows]
+        )
+        return {"status": "success", "count": len(rows), "message": f"{len(rows)} time entries added successfully"}
+
 @mcp.tool()
 def list_time_entries(start_date: str, end_date: str, activity: str = None):
     """List time entries within a date range, optionally filtered by activity.
@@ -162,27 +393,12 @@ def list_time_entries(start_date: str, end_date: str, activity: str = None):
         end_date: End date in YYYY-MM-DD format
         activity: Optional activity filter
     """
-    with sqlite3.connect(DB_PATH) as c:
-        query = """
-            SELECT id, date, activity, duration_minutes, start_time, end_time, note
-            FROM time_entries
-            WHERE date BETWEEN ? AND ?
-        """
-        params = [start_date, end_date]
+    with _db() as c:
         if activity:
-            query += " AND activity = ?"
-            params.append(activity)
-        query += " ORDER BY date DESC, start_time DESC"
-        
-        cur = c.execute(query, params)
-        cols = [d[0] for d in cur.description]
-        results = [dict(zip(cols, r)) for r in cur.fetchall()]
-        
-        # Convert minutes to hours for easier reading
-        for r in results:
-            r['duration_hours'] = round(r['duration_minutes'] / 60, 2)
-        
-        return results
+            cur = c.execute(_SQL_LIST_TIME_ACT, (start_date, end_date, activity))
+        else:
+            cur = c.execute(_SQL_LIST_TIME, (start_date, end_date))
+        return _rows(cur)
 
 @mcp.tool()
 def summarize_time(start_date: str, end_date: str, activity: str = None):
@@ -193,33 +409,12 @@ def summarize_time(start_date: str, end_date: str, activity: str = None):
         end_date: End date in YYYY-MM-DD format
         activity: Optional activity filter
     """
-    with sqlite3.connect(DB_PATH) as c:
-        query = """
-            SELECT activity, 
-                   SUM(duration_minutes) AS total_minutes,
-                   COUNT(*) as entry_count,
-                   AVG(duration_minutes) as avg_minutes
-            FROM time_entries
-            WHERE date BETWEEN ? AND ?
-        """
-        params = [start_date, end_date]
+    with _db() as c:
         if activity:
-            query += " AND activity = ?"
-            params.append(activity)
-        query += " GROUP BY activity ORDER BY total_minutes DESC"
-        
-        cur = c.execute(query, params)
-        cols = [d[0] for d in cur.description]
-        results = [dict(zip(cols, r)) for r in cur.fetchall()]
-        
-        # Add hours conversion and percentage
-        total_all = sum(r['total_minutes'] for r in results)
-        for r in results:
-            r['total_hours'] = round(r['total_minutes'] / 60, 2)
-            r['avg_hours'] = round(r['avg_minutes'] / 60, 2)
-            r['percentage'] = round((r['total_minutes'] / total_all * 100), 1) if total_all > 0 else 0
-        
-        return results
+            cur = c.execute(_SQL_SUM_TIME_ACT, (start_date, end_date, activity))
+        else:
+            cur = c.execute(_SQL_SUM_TIME, (start_date, end_date))
+        return _rows(cur)
 
 @mcp.tool()
 def get_daily_summary(date: str):
@@ -228,35 +423,43 @@ def get_daily_summary(date: str):
     Args:
         date: Date in YYYY-MM-DD format
     """
-    with sqlite3.connect(DB_PATH) as c:
-        # Get expenses
+    with _db() as c:
+        # Expense and time totals in one round trip, tagged E / T by kind
         cur = c.execute(
-            "SELECT category, SUM(amount) as total FROM expenses WHERE date = ? GROUP BY category",
-            (date,)
-        )
-        expenses = [{"category": r[0], "total": r[1]} for r in cur.fetchall()]
-        
-        # Get time entries
-        cur = c.execute(
-            "SELECT activity, SUM(duration_minutes) as total_minutes FROM time_entries WHERE date = ? GROUP BY activity",
-            (date,)
+            """
+            SELECT 'E' AS kind, category AS key, ROUND(total, 2), NULL AS hours
+            FROM daily_expense_rollup WHERE date = ?
+            UNION ALL
+            SELECT 'T', activity, total_minutes, ROUND(total_minutes / 60.0, 2)
+            FROM daily_time_rollup WHERE date = ?
+            ORDER BY kind, key
+            """,
+            (date, date)
         )
-        time_entries = [{"activity": r[0], "minutes": r[1], "hours": round(r[1]/60, 2)} for r in cur.fetchall()]
+        expenses, time_entries = [], []
+        total_expense = total_hours = 0
+        for kind, key, total, hours in cur.fetchall():
+            if kind == 'E':
+                expenses.append({"category": key, "total": total})
+                total_expense += total
+            else:
+                time_entries.append({"activity": key, "minutes": total, "hours": hours})
+                total_hours += hours
         
         return {
             "date": date,
             "expenses": expenses,
-            "total_expense": sum(e['total'] for e in expenses),
+            "total_expense": round(total_expense, 2),
             "time_entries": time_entries,
-            "total_hours": sum(t['hours'] for t in time_entries)
+            "total_hours": round(total_hours, 2)
         }
 
 @mcp.tool()
 def list_activities():
     """List all available activity categories with their colors."""
-    with sqlite3.connect(DB_PATH) as c:
+    with _db() as c:
         cur = c.execute("SELECT name, color FROM activity_categories ORDER BY name")
-        return [{"name": r[0], "color": r[1]} for r in cur.fetchall()]
+        return _rows(cur)
 
 @mcp.tool()
 def add_activity_category(name: str, color: str = "#3b82f6"):
@@ -266,40 +469,48 @@ def add_activity_category(name: str, color: str = "#3b82f6"):
         name: Activity category name
         color: Hex color code (default: blue)
     """
-    try:
-        with sqlite3.connect(DB_PATH) as c:
-            c.execute("INSERT INTO activity_categories(name, color) VALUES (?, ?)", (name, color))
-            return {"status": "success", "message": f"Activity category '{name}' added"}
-    except sqlite3.IntegrityError:
-        return {"status": "error", "message": f"Activity category '{name}' already exists"}
+    with _db() as c:
+        cur = c.execute("INSERT OR IGNORE INTO activity_categories(name, color) VALUES (?, ?)", (name, color))
+        if cur.rowcount == 0:
+            return {"status": "error", "message": f"Activity category '{name}' already exists"}
+        return {"status": "success", "message": f"Activity category '{name}' added"}
 
 # ==================== RESOURCES ====================
 
+# Default categories, served when categories.json is missing
+_DEFAULT_CATEGORIES_JSON = json.dumps({
+    "categories": [
+        "Food & Dining",
+        "Transportation",
+        "Shopping",
+        "Entertainment",
+        "Bills & Utilities",
+        "Healthcare",
+        "Travel",
+        "Education",
+        "Business",
+        "Other"
+    ]
+}, indent=2)
+
+# (st_mtime_ns, contents) of the last categories.json read
+_categories_cache = None
+
 @mcp.resource("expense:///categories")
 def expense_categories():
     """Get expense categories"""
+    global _categories_cache
     try:
-        if os.path.exists(CATEGORIES_PATH):
-            with open(CATEGORIES_PATH, "r", encoding="utf-8") as f:
-                return f.read()
-        else:
-            # Default categories
-            import json
-            default = {
-                "categories": [
-                    "Food & Dining",
-                    "Transportation", 
-                    "Shopping",
-                    "Entertainment",
-                    "Bills & Utilities",
-                    "Healthcare",
-                    "Travel",
-                    "Education",
-                    "Business",
-                    "Other"
-                ]
-            }
-            return json.dumps(default, indent=2)
+        try:
+            mtime = os.stat(CATEGORIES_PATH).st_mtime_ns
+        except FileNotFoundError:
+            return _DEFAULT_CATEGORIES_JSON
+        if _categories_cache and _categories_cache[0] == mtime:
+            return _categories_cache[1]
+        with open(CATEGORIES_PATH, "r", encoding="utf-8") as f:
+            data = f.read()
+        _categories_cache = (mtime, data)
+        return data
     except Exception as e:
         return f'{{"error": "{str(e)}"}}'
 